@@ -1,13 +1,18 @@
 import re
+import time
+import asyncio
 import logging
+import functools
 import pytz
 
+from array import array
+
 from dateutil import parser
 from dateutil.tz import gettz
-from datetime import datetime, timezone, timedelta
-from typing import List, Optional, Tuple, cast
+from datetime import datetime, timezone, timedelta, tzinfo
+from typing import Dict, List, Optional, Tuple, Union, cast
 
-from redbot.core import commands, Config
+from redbot.core import commands, Config, VersionInfo, version_info
 from redbot.core.bot import Red
 from redbot.core.utils.chat_formatting import humanize_list, pagify, humanize_timedelta
 from redbot.core.i18n import Translator, cog_i18n
@@ -22,6 +27,8 @@ log = logging.getLogger("red.trusty-cogs.EventPoster")
 _ = Translator("EventPoster", __file__)
 
 IMAGE_LINKS = re.compile(r"(http[s]?:\/\/[^\"\']*\.(?:png|jpg|jpeg|gif|png))", flags=re.I)
+# Cheap substring check so arguments that can't be image links skip the regex
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif")
 
 # the following regex is slightly modified from Red
 # it's changed to be slightly more strict on matching with finditer
@@ -29,160 +36,217 @@ IMAGE_LINKS = re.compile(r"(http[s]?:\/\/[^\"\']*\.(?:png|jpg|jpeg|gif|png))", f
 # This is also designed more to allow time interval at the beginning or the end of the mute
 # to account for those times when you think of adding time *after* already typing out the reason
 # https://github.com/Cog-Creators/Red-DiscordBot/blob/V3/develop/redbot/core/commands/converter.py#L55
+# Only the unit values are capturing groups so `match.lastgroup` names the unit matched
 TIME_RE_STRING = r"|".join(
     [
-        r"((?P<weeks>\d+?)\s?(weeks?|w))",
-        r"((?P<days>\d+?)\s?(days?|d))",
-        r"((?P<hours>\d+?)\s?(hours?|hrs|hr?))",
-        r"((?P<minutes>\d+?)\s?(minutes?|mins?|m(?!o)))",  # prevent matching "months"
-        r"((?P<seconds>\d+?)\s?(seconds?|secs?|s))",
+        r"(?P<weeks>\d+?)\s?(?:weeks?|w)",
+        r"(?P<days>\d+?)\s?(?:days?|d)",
+        r"(?P<hours>\d+?)\s?(?:hours?|hrs|hr?)",
+        r"(?P<minutes>\d+?)\s?(?:minutes?|mins?|m(?!o))",  # prevent matching "months"
+        r"(?P<seconds>\d+?)\s?(?:seconds?|secs?|s)",
     ]
 )
 TIME_RE = re.compile(TIME_RE_STRING, re.I)
 
+# Rough check for anything dateutil could turn into a date so we can
+# skip the fuzzy parser entirely for plain descriptions.
+# Weekday and month names are matched by their short forms which also cover the full names.
+# Descriptions whose only date-like text is a bare number or a timezone
+# name, e.g. "raid at 8" or "raid EST", are intentionally not parsed.
+# Hour forms like "20h" never get here since TIME_RE reads them as an interval first.
+HAS_DATE_RE = re.compile(
+    r"\d{1,4}[-/:.]\d{1,2}|tomorrow|today|tonight|"
+    r"mon|tue|wed|thu|fri|sat|sun|"
+    r"am\b|pm\b|utc|gmt|"
+    r"jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec",
+    re.I,
+)
 
-class TimeZones:
-    def __init__(self):
-        self.zones = {}
-        self._last_updated = 0
 
-    def get_zones(self):
-        delta = datetime.now() - datetime.fromtimestamp(self._last_updated)
-        if not self.zones or delta > timedelta(days=1):
-            # only generate a new list of timezones daily
-            # This should save some processing time while still
-            # giving flexibility based on timezones available
-            self.gen_tzinfos()
-            return self.zones
-        else:
-            return self.zones
+_gettz = functools.lru_cache(maxsize=None)(gettz)
 
-    def gen_tzinfos(self):
-        self._last_updated = datetime.now().timestamp()
-        self.zones = {}
-        # reset so we don't end up with two timezones present at once daily
-        for zone in pytz.common_timezones:
+
+def _build() -> Dict[str, tzinfo]:
+    zones = {}
+    year = datetime.utcnow().year
+    # Localize at a winter and a summer date so both the standard and daylight
+    # savings names are known no matter what time of year the map is built
+    dates = (datetime(year, 1, 15, 12), datetime(year, 7, 15, 12))
+    for zone in pytz.common_timezones:
+        tz = pytz.timezone(zone)
+        for date in dates:
             try:
-                tzdate = pytz.timezone(zone).localize(datetime.utcnow(), is_dst=None)
-            except pytz.NonExistentTimeError:
+                tzdate = tz.localize(date, is_dst=None)
+            except (pytz.NonExistentTimeError, pytz.AmbiguousTimeError):
                 # This catches times that don't exist due to Daylight savings time
-                pass
-            else:
-                tzinfo = gettz(zone)
-                self.zones[tzdate.tzname()] = tzinfo
-                # store the timezone info into a dict to be returned
-                # for the parser to understand common timezone short names
+                continue
+            # store the timezone info into a dict to be returned
+            # for the parser to understand common timezone short names
+            zones[tzdate.tzname()] = _gettz(zone)
+    return zones
 
 
-TIMEZONES = TimeZones()
+# Built once at import so the first parsed event doesn't pay for
+# looking up every common timezone
+_ZONES: Dict[str, tzinfo] = _build()
 
 
 class Event:
+    __slots__ = (
+        "hoster",
+        "members",
+        "event",
+        "max_slots",
+        "approver",
+        "message",
+        "channel",
+        "guild",
+        "maybe",
+        "start",
+        "cog",
+        "_members_set",
+        "_maybe_set",
+        "_start_ts",
+        "_msg_ts",
+        "_persist_task",
+        "_embed_cache",
+    )
+
     hoster: int
-    members: List[int]
+    members: array
     event: str
     max_slots: Optional[int]
     approver: Optional[int]
     message: Optional[int]
     channel: Optional[int]
     guild: int
-    maybe: List[int]
+    maybe: array
     start: Optional[datetime]
+    cog: Optional[commands.Cog]
 
     def __init__(self, **kwargs):
         self.hoster = kwargs.get("hoster")
-        self.members = kwargs.get("members")
+        # user IDs are stored packed as unsigned 64 bit ints rather than boxed in a list
+        self.members = array("Q", kwargs.get("members") or [])
         self.event = kwargs.get("event")
         self.max_slots = kwargs.get("max_slots")
         self.approver = kwargs.get("approver")
         self.message = kwargs.get("message")
         self.channel = kwargs.get("channel")
         self.guild = kwargs.get("guild")
-        self.maybe = kwargs.get("maybe", [])
+        self.maybe = array("Q", kwargs.get("maybe") or [])
         self.start = kwargs.get("start", None)
+        self.cog = kwargs.get("cog", None)
+        # The arrays keep signup order for display, the sets are for membership checks
+        self._members_set = set(self.members)
+        self._maybe_set = set(self.maybe)
+        self._start_ts: Optional[float] = self.start.timestamp() if self.start else None
+        self._msg_ts: Optional[float] = None
+        self._persist_task: Optional[asyncio.Task] = None
+        # (key, base embed, prefix, hoster) for the parts that don't change on signups
+        self._embed_cache: Optional[Tuple[tuple, discord.Embed, str, str]] = None
 
     def __repr__(self):
         return "<Event description={0.event} hoster={0.hoster} start={0.start}>".format(self)
 
+    def _add_member(self, user_id: int) -> None:
+        if user_id in self._members_set:
+            return
+        self.members.append(user_id)
+        self._members_set.add(user_id)
+
+    def _remove_member(self, user_id: int) -> None:
+        if user_id not in self._members_set:
+            return
+        self.members.remove(user_id)
+        self._members_set.discard(user_id)
+
+    def _add_maybe(self, user_id: int) -> None:
+        if user_id in self._maybe_set:
+            return
+        self.maybe.append(user_id)
+        self._maybe_set.add(user_id)
+
+    def _remove_maybe(self, user_id: int) -> None:
+        if user_id not in self._maybe_set:
+            return
+        self.maybe.remove(user_id)
+        self._maybe_set.discard(user_id)
+
     async def start_time(self) -> Optional[datetime]:
-        date = None
-        if self.start is None:
-            # assume it's a timedelta first
-            # if it's not a timedelta we can try searching for a date
-            time_data = {}
-            for time in TIME_RE.finditer(self.event):
-                for k, v in time.groupdict().items():
-                    if v:
-                        time_data[k] = int(v)
-            if time_data:
-                date = datetime.now(timezone.utc) + timedelta(**time_data)
-            else:
-                try:
-                    date, tokens = parser.parse(
-                        self.event, fuzzy_with_tokens=True, tzinfos=TIMEZONES.get_zones()
-                    )
-                    if date and "tomorrow" in self.event.lower():
-                        date += timedelta(days=1)
-                    date.replace(tzinfo=timezone.utc)
-                except Exception:
-                    log.debug("Error parsing datetime.")
-            if date:
-                log.debug("setting start date")
-                self.start = date
-                return date
-            else:
-                return None
-        else:
+        if self.start is not None:
             return self.start
+        # assume it's a timedelta first
+        # if it's not a timedelta we can try searching for a date
+        time_data = {}
+        for time_match in TIME_RE.finditer(self.event):
+            unit = time_match.lastgroup
+            value = time_match.group(unit)
+            if value:
+                time_data[unit] = int(value)
+        if time_data:
+            log.debug("setting start date")
+            self.start = datetime.now(timezone.utc) + timedelta(**time_data)
+            self._start_ts = self.start.timestamp()
+            return self.start
+        if not HAS_DATE_RE.search(self.event):
+            return None
+        date = None
+        try:
+            date, tokens = parser.parse(self.event, fuzzy_with_tokens=True, tzinfos=_ZONES)
+            if date and "tomorrow" in self.event.lower():
+                date += timedelta(days=1)
+            if date.tzinfo is None:
+                date = date.replace(tzinfo=timezone.utc)
+        except Exception:
+            log.debug("Error parsing datetime.")
+        if date:
+            log.debug("setting start date")
+            self.start = date
+            self._start_ts = date.timestamp()
+            return date
+        return None
+
+    def _message_timestamp(self) -> float:
+        # message IDs never change so the snowflake only needs decoding once
+        if self._msg_ts is None:
+            self._msg_ts = snowflake_time(self.message).replace(tzinfo=timezone.utc).timestamp()
+        return self._msg_ts
 
     def should_remove(self, seconds: int) -> bool:
         """
         Returns True if we should end the event
         Returns False if the event should stay open
         """
-        now = datetime.now(timezone.utc).timestamp()
+        now = time.time()
         if self.message is None:
             # If we don't even have a message linked to this event delete it
             # although in practice this should never happen
             return True
         if self.start:
-            future = (
-                self.start + timedelta(seconds=seconds)
-            ).timestamp()
-            log.debug(f"{humanize_timedelta(seconds = future-now)}")
-            return now > future
+            future = self._start_ts + seconds
         else:
-            future = (
-                snowflake_time(self.message).replace(tzinfo=timezone.utc)
-                + timedelta(seconds=seconds)
-            ).timestamp()
-            log.debug(f"{humanize_timedelta(seconds = future-now)}")
-            return now > future
+            future = self._message_timestamp() + seconds
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("%s", humanize_timedelta(seconds=future - now))
+        return now > future
 
     def remaining(self, seconds: int) -> str:
         """
         Returns the time remaining on an event
         """
-        now = datetime.now(timezone.utc).timestamp()
+        now = time.time()
         if self.message is None:
             # If we don't even have a message linked to this event delete it
             # although in practice this should never happen
             return _("0 seconds")
         if self.start:
-            future = (
-                self.start + timedelta(seconds=seconds)
-            ).timestamp()
-            diff = future-now
-            log.debug(f"Set time {future=} {now=} {diff=}")
-            return humanize_timedelta(seconds=future - now)
+            future = self._start_ts + seconds
+            log.debug("Set time future=%s now=%s diff=%s", future, now, future - now)
         else:
-            future = (
-                snowflake_time(self.message).replace(tzinfo=timezone.utc)
-                + timedelta(seconds=seconds)
-            ).timestamp()
-            diff = future-now
-            log.debug(f"Message Time {future=} {now=} {diff=}")
-            return humanize_timedelta(seconds=future - now)
+            future = self._message_timestamp() + seconds
+            log.debug("Message Time future=%s now=%s diff=%s", future, now, future - now)
+        return humanize_timedelta(seconds=future - now)
 
     async def get_ctx(self, bot: Red) -> Optional[commands.Context]:
         """
@@ -203,19 +267,87 @@ class Event:
             return None
         return await bot.get_context(msg)
 
+    async def _get_edit_message(
+        self, bot: Red
+    ) -> Optional[Union[discord.Message, "discord.PartialMessage"]]:
+        chan = bot.get_channel(self.channel)
+        if not chan:
+            return None
+        if version_info >= VersionInfo.from_str("3.4.6"):
+            # editing doesn't need the message contents so skip fetching it
+            return chan.get_partial_message(self.message)
+        try:
+            return await chan.fetch_message(self.message)
+        except (discord.errors.NotFound, discord.errors.Forbidden):
+            return None
+
     async def edit(self, context: commands.Context, **kwargs) -> None:
-        ctx = await self.get_ctx(context.bot)
-        if not ctx:
+        msg = await self._get_edit_message(context.bot)
+        if not msg:
+            return
+        try:
+            await msg.edit(**kwargs)
+        except (discord.errors.NotFound, discord.errors.Forbidden):
             return
-        await ctx.message.edit(**kwargs)
 
-    def mention(self, include_maybe: bool):
-        members = self.members
-        if include_maybe:
-            members += self.maybe
-        return humanize_list([f"<@!{m}>" for m in members])
+    def mention_ping(self, include_maybe: bool) -> str:
+        """
+        Returns a space separated string of mentions for pinging attendees
+        """
+        members = [*self.members, *self.maybe] if include_maybe else self.members
+        return " ".join(map("<@!{}>".format, members))
 
-    async def make_event_embed(self, ctx: commands.Context) -> discord.Embed:
+    def persist(self, delay: float = 0.5) -> None:
+        """
+        Schedules saving this event to config without waiting on it
+
+        Any changes made before the save runs are written together
+        """
+        if self._persist_task is None:
+            self._persist_task = asyncio.create_task(self._persist(delay))
+
+    def flush(self) -> Optional[asyncio.Task]:
+        """
+        Runs any pending save now instead of waiting out the delay
+        """
+        if self._persist_task is None:
+            return None
+        self.cancel_persist()
+        return asyncio.create_task(self._persist(0))
+
+    def cancel_persist(self) -> None:
+        """
+        Cancels any pending save for callers that are about to save the event themselves
+        """
+        if self._persist_task is None:
+            return
+        # the task only stays set while it's still sleeping so cancelling is safe
+        self._persist_task.cancel()
+        self._persist_task = None
+
+    async def _persist(self, delay: float) -> None:
+        await asyncio.sleep(delay)
+        # clear first so changes made while writing schedule another save
+        self._persist_task = None
+        try:
+            if self.cog.event_cache.get(self.guild, {}).get(self.message) is not self:
+                # This event was ended or replaced by a newer copy while we were waiting
+                return
+            async with self.cog.config.guild_from_id(self.guild).events() as cur_events:
+                current = cur_events.get(str(self.hoster))
+                if not current or current.get("message") != self.message:
+                    # The event was ended while we were waiting
+                    return
+                cur_events[str(self.hoster)] = self.to_json()
+        except Exception:
+            log.exception("Error saving event %r", self)
+
+    def clear_embed_cache(self) -> None:
+        self._embed_cache = None
+
+    async def _make_base_embed(
+        self, ctx: commands.Context, config: Config, start: Optional[datetime]
+    ) -> Tuple[discord.Embed, str, str]:
         hoster = ctx.guild.get_member(self.hoster)
         em = discord.Embed()
         em.set_author(
@@ -227,6 +359,53 @@ class Event:
         except AttributeError:
             prefixes = await ctx.bot.get_prefix(ctx.message)
             prefix = prefixes[0]
+        if self.approver:
+            approver = ctx.guild.get_member(self.approver)
+            em.set_footer(
+                text=_("Approved by {approver}").format(approver=approver),
+                icon_url=approver.avatar_url,
+            )
+        if start is not None:
+            em.timestamp = start
+        event_lower = self.event.lower()
+        thumbnails = await config.guild(ctx.guild).custom_links()
+        thumbnail = None
+        for name, link in thumbnails.items():
+            if name.lower() in event_lower:
+                thumbnail = link
+        if thumbnail:
+            em.set_thumbnail(url=thumbnail)
+        images = await config.guild(ctx.guild).large_links()
+        image = None
+        for name, link in images.items():
+            if name.lower() in event_lower:
+                image = link
+        if image:
+            em.set_image(url=image)
+        return em, prefix, str(hoster)
+
+    async def make_event_embed(self, ctx: commands.Context) -> discord.Embed:
+        cog = self.cog or ctx.bot.get_cog("EventPoster")
+        config = cog.config
+        start = await self.start_time()
+        # Only the slots and attendee lists change as people sign up
+        # so everything else is built once until the event itself,
+        # the hoster or approver, or the guild's links are changed
+        hoster_member = ctx.guild.get_member(self.hoster)
+        approver = ctx.guild.get_member(self.approver) if self.approver else None
+        key = (
+            self.event,
+            start,
+            str(hoster_member),
+            str(hoster_member.avatar_url),
+            str(approver),
+            str(approver.avatar_url) if approver else None,
+        )
+        if self._embed_cache is None or self._embed_cache[0] != key:
+            base, prefix, hoster = await self._make_base_embed(ctx, config, start)
+            self._embed_cache = (key, base, prefix, hoster)
+        base, prefix, hoster = self._embed_cache[1:]
+        em = base.copy()
         max_slots_msg = ""
         if self.max_slots:
             slots = self.max_slots - len(self.members)
@@ -245,10 +424,10 @@ class Event:
             max_slots_msg=max_slots_msg,
         )
         player_list = ""
-        config = ctx.bot.get_cog("EventPoster").config
+        all_players = await config.all_members(ctx.guild)
         for i, member in enumerate(self.members):
             player_class = ""
-            has_player_class = await config.member_from_ids(ctx.guild.id, member).player_class()
+            has_player_class = all_players.get(member, {}).get("player_class")
             mem = ctx.guild.get_member(member)
             if has_player_class:
                 player_class = f" - {has_player_class}"
@@ -260,24 +439,6 @@ class Event:
         if self.maybe and len(em.fields) < 25:
             maybe = [f"<@!{m}>" for m in self.maybe]
             em.add_field(name=_("Maybe"), value=humanize_list(maybe))
-        if self.approver:
-            approver = ctx.guild.get_member(self.approver)
-            em.set_footer(
-                text=_("Approved by {approver}").format(approver=approver),
-                icon_url=approver.avatar_url,
-            )
-        start = await self.start_time()
-        if start is not None:
-            em.timestamp = start
-        config = Config.get_conf(None, identifier=144014746356678656, cog_name="EventPoster")
-        thumbnails = await config.guild(ctx.guild).custom_links()
-        for name, link in thumbnails.items():
-            if name.lower() in self.event.lower():
-                em.set_thumbnail(url=link)
-        images = await config.guild(ctx.guild).large_links()
-        for name, link in images.items():
-            if name.lower() in self.event.lower():
-                em.set_image(url=link)
         return em
 
     @classmethod
@@ -286,7 +447,7 @@ class Event:
         new_members = []
         for m in members:
             if isinstance(m, tuple) or isinstance(m, list):
-                log.debug(f"Converting to new members list in {data.get('channel')}")
+                log.debug("Converting to new members list in %s", data.get("channel"))
                 new_members.append(m[0])
             else:
                 new_members.append(m)
@@ -308,25 +469,29 @@ class Event:
             channel=data.get("channel"),
             maybe=data.get("maybe"),
             start=start,
+            cog=bot.get_cog("EventPoster"),
         )
 
     def to_json(self):
         return {
             "hoster": self.hoster,
-            "members": self.members,
+            "members": list(self.members),
             "event": self.event,
             "max_slots": self.max_slots,
             "approver": self.approver,
             "message": self.message,
             "channel": self.channel,
             "guild": self.guild,
-            "maybe": self.maybe,
+            "maybe": list(self.maybe),
             "start": int(self.start.timestamp()) if self.start is not None else None,
         }
 
 
 class ValidImage(Converter):
     async def convert(self, ctx, argument):
+        lowered = argument.lower()
+        if not any(ext in lowered for ext in IMAGE_EXTENSIONS):
+            raise BadArgument(_("That's not a valid image link."))
         search = IMAGE_LINKS.search(argument)
         if not search:
             raise BadArgument(_("That's not a valid image link."))
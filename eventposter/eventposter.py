@@ -66,6 +66,28 @@ class EventPoster(commands.Cog):
 
     def cog_unload(self):
         self.cleanup_old_events.cancel()
+        for events in self.event_cache.values():
+            for event in events.values():
+                # write out any signups still waiting on their delayed save
+                event.flush()
+
+    def clear_embed_caches(self, guild_id: int) -> None:
+        """
+        Makes every cached event in a guild rebuild its whole embed on the next update
+        """
+        for event in self.event_cache.get(guild_id, {}).values():
+            event.clear_embed_cache()
+
+    def get_hoster_event(self, guild_id: int, hoster_id: int, data: dict) -> Event:
+        """
+        Returns the cached event for a hoster, only loading it from config if it isn't cached
+
+        The cached event may have signups that haven't been saved to config yet.
+        """
+        for event in self.event_cache.get(guild_id, {}).values():
+            if event.hoster == hoster_id:
+                return event
+        return Event.from_json(self.bot, data)
 
     async def red_delete_data_for_user(
         self,
@@ -99,7 +121,7 @@ class EventPoster(commands.Cog):
             for message_id, event in events.items():
                 if event.should_remove(cleanup_seconds):
                     to_remove.append(message_id)
-                    log.debug(f"Removing {event} due to age.")
+                    log.debug("Removing %s due to age.", event)
             for msg_id in to_remove:
                 ctx = await events[msg_id].get_ctx(self.bot)
                 if ctx:
@@ -201,45 +223,41 @@ class EventPoster(commands.Cog):
         if str(payload.emoji) == "\N{WHITE HEAVY CHECK MARK}":
             if user.id == event.hoster:
                 return
-            if user.id not in event.maybe:
+            if user.id not in event._maybe_set:
                 await self.remove_user_from_event(user, event)
         if str(payload.emoji) == "\N{WHITE QUESTION MARK ORNAMENT}":
             if user.id == event.hoster:
                 return
-            if user.id not in event.members:
+            if user.id not in event._members_set:
                 await self.remove_user_from_event(user, event)
 
     async def add_user_to_event(self, user: discord.Member, event: Event) -> None:
-        if user.id in event.members:
+        if user.id in event._members_set:
             return
         if event.max_slots and len(event.members) >= event.max_slots:
             return
-        event.members.append(user.id)
-        if user.id in event.maybe:
-            event.maybe.remove(user.id)
+        event._add_member(user.id)
+        event._remove_maybe(user.id)
         ctx = await event.get_ctx(self.bot)
         if not ctx:
             return
         em = await event.make_event_embed(ctx)
         await event.edit(ctx, embed=em)
-        async with self.config.guild(ctx.guild).events() as cur_events:
-            cur_events[str(event.hoster)] = event.to_json()
+        event.persist()
         self.event_cache[ctx.guild.id][event.message] = event
         return
 
     async def add_user_to_maybe(self, user: discord.Member, event: Event) -> None:
-        if user.id in event.maybe:
+        if user.id in event._maybe_set:
             return
-        event.maybe.append(user.id)
-        if user.id in event.members:
-            event.members.remove(user.id)
+        event._add_maybe(user.id)
+        event._remove_member(user.id)
         ctx = await event.get_ctx(self.bot)
         if not ctx:
             return
         em = await event.make_event_embed(ctx)
         await event.edit(ctx, embed=em)
-        async with self.config.guild(ctx.guild).events() as cur_events:
-            cur_events[str(event.hoster)] = event.to_json()
+        event.persist()
         self.event_cache[ctx.guild.id][event.message] = event
         return
 
@@ -248,19 +266,17 @@ class EventPoster(commands.Cog):
         ctx = await event.get_ctx(self.bot)
         if not ctx:
             return
-        if user.id in event.members:
-            event.members.remove(user.id)
+        if user.id in event._members_set:
+            event._remove_member(user.id)
             em = await event.make_event_embed(ctx)
             await event.edit(ctx, embed=em)
-            async with self.config.guild(ctx.guild).events() as cur_events:
-                cur_events[str(event.hoster)] = event.to_json()
+            event.persist()
             self.event_cache[ctx.guild.id][event.message] = event
-        if user.id in event.maybe:
-            event.maybe.remove(user.id)
+        if user.id in event._maybe_set:
+            event._remove_maybe(user.id)
             em = await event.make_event_embed(ctx)
             await event.edit(ctx, embed=em)
-            async with self.config.guild(ctx.guild).events() as cur_events:
-                cur_events[str(event.hoster)] = event.to_json()
+            event.persist()
             self.event_cache[ctx.guild.id][event.message] = event
 
     @commands.command(name="eventping", aliases=["eventmention"])
@@ -282,8 +298,8 @@ class EventPoster(commands.Cog):
         if str(ctx.author.id) not in await self.config.guild(ctx.guild).events():
             return await ctx.send(_("You don't have an event running with people to ping."))
         event_data = await self.config.guild(ctx.guild).events()
-        event = Event.from_json(self.bot, event_data[str(ctx.author.id)])
-        msg = event.mention(include_maybe) + ":\n" + message
+        event = self.get_hoster_event(ctx.guild.id, ctx.author.id, event_data[str(ctx.author.id)])
+        msg = event.mention_ping(include_maybe) + ":\n" + message
         for page in pagify(msg):
             await ctx.send(page, allowed_mentions=discord.AllowedMentions(users=True))
             # include AllowedMentions here just incase someone has user mentions disabled
@@ -386,6 +402,7 @@ class EventPoster(commands.Cog):
             max_slots=max_slots,
             guild=ctx.guild.id,
             channel=announcement_channel.id,
+            cog=self,
         )
 
         if await self.config.guild(ctx.guild).bypass_admin():
@@ -442,7 +459,9 @@ class EventPoster(commands.Cog):
             return await ctx.send(_("You don't have any events running."))
         elif not clear:
             event_data = await self.config.guild(ctx.guild).events()
-            event = Event.from_json(self.bot, event_data[str(ctx.author.id)])
+            event = self.get_hoster_event(
+                ctx.guild.id, ctx.author.id, event_data[str(ctx.author.id)]
+            )
             if not event:
                 async with self.config.guild(ctx.guild).events() as events:
                     # clear the broken event
@@ -477,7 +496,7 @@ class EventPoster(commands.Cog):
                 _("{member} does not have any events running.").format(member=member)
             )
         event_data = await self.config.guild(ctx.guild).events()
-        event = Event.from_json(self.bot, event_data[str(member.id)])
+        event = self.get_hoster_event(ctx.guild.id, member.id, event_data[str(member.id)])
         if not event:
             async with self.config.guild(ctx.guild).events() as events:
                 # clear the broken event
@@ -509,7 +528,7 @@ class EventPoster(commands.Cog):
                 )
             )
         event_data = await self.config.guild(ctx.guild).events()
-        event = Event.from_json(self.bot, event_data[str(hoster.id)])
+        event = self.get_hoster_event(ctx.guild.id, hoster.id, event_data[str(hoster.id)])
         if not event:
             async with self.config.guild(ctx.guild).events() as events:
                 # clear the broken event
@@ -520,7 +539,7 @@ class EventPoster(commands.Cog):
                     hoster=hoster.display_name
                 )
             )
-        if ctx.author.id in event.members:
+        if ctx.author.id in event._members_set:
             return await ctx.send(_("You're already participating in this event!"))
         await self.add_user_to_event(ctx.author, event)
         await ctx.tick()
@@ -536,7 +555,7 @@ class EventPoster(commands.Cog):
                 )
             )
         event_data = await self.config.guild(ctx.guild).events()
-        event = Event.from_json(self.bot, event_data[str(hoster.id)])
+        event = self.get_hoster_event(ctx.guild.id, hoster.id, event_data[str(hoster.id)])
         if not event:
             async with self.config.guild(ctx.guild).events() as events:
                 # clear the broken event
@@ -547,7 +566,7 @@ class EventPoster(commands.Cog):
                     hoster=hoster.display_name
                 )
             )
-        if ctx.author.id not in event.members:
+        if ctx.author.id not in event._members_set:
             return await ctx.send(_("You're not participating in this event!"))
         await self.remove_user_from_event(ctx.author, event)
         await ctx.tick()
@@ -572,16 +591,16 @@ class EventPoster(commands.Cog):
         if str(hoster.id) not in await self.config.guild(ctx.guild).events():
             return await ctx.send(_("You are not currently hosting any events."))
         event_data = await self.config.guild(ctx.guild).events()
-        event = Event.from_json(self.bot, event_data[str(ctx.author.id)])
+        event = self.get_hoster_event(ctx.guild.id, hoster.id, event_data[str(hoster.id)])
         if not event:
             async with self.config.guild(ctx.guild).events() as events:
                 # clear the broken event
                 del events[str(ctx.author.id)]
                 del self.event_cache[ctx.guild.id][event.message]
             return await ctx.send(_("That user is not currently hosting any events."))
-        if member.id not in event.members:
+        if member.id not in event._members_set:
             return await ctx.send(_("That member is not participating in that event!"))
-        await self.remove_from_event(member, event)
+        await self.remove_user_from_event(member, event)
         await ctx.tick()
 
     @commands.group(name="eventedit", aliases=["editevent"])
@@ -719,6 +738,8 @@ class EventPoster(commands.Cog):
                 for m in new_members:
                     await self.add_user_to_event(m, event)
 
+                # saved right away below so the delayed save isn't needed
+                event.cancel_persist()
                 async with self.config.guild(ctx.guild).events() as cur_events:
                     cur_events[str(event.hoster)] = event.to_json()
                 self.event_cache[ctx.guild.id][event.message] = event
@@ -742,9 +763,11 @@ class EventPoster(commands.Cog):
         for message_id, event in self.event_cache[ctx.guild.id].items():
             if event.hoster == ctx.author.id:
                 for m in members:
-                    if m.id in event.members or m.id in event.maybe:
+                    if m.id in event._members_set or m.id in event._maybe_set:
                         await self.remove_user_from_event(m, event)
 
+                # saved right away below so the delayed save isn't needed
+                event.cancel_persist()
                 async with self.config.guild(ctx.guild).events() as cur_events:
                     cur_events[str(event.hoster)] = event.to_json()
                 self.event_cache[ctx.guild.id][event.message] = event
@@ -774,9 +797,11 @@ class EventPoster(commands.Cog):
         for message_id, event in self.event_cache[ctx.guild.id].items():
             if event.hoster == ctx.author.id:
                 for m in new_members:
-                    if m.id not in event.members:
+                    if m.id not in event._members_set:
                         await self.add_user_to_maybe(m, event)
 
+                # saved right away below so the delayed save isn't needed
+                event.cancel_persist()
                 async with self.config.guild(ctx.guild).events() as cur_events:
                     cur_events[str(event.hoster)] = event.to_json()
                 self.event_cache[ctx.guild.id][event.message] = event
@@ -800,9 +825,11 @@ class EventPoster(commands.Cog):
         for message_id, event in self.event_cache[ctx.guild.id].items():
             if event.hoster == ctx.author.id:
                 for m in members:
-                    if m.id in event.members or m.id in event.maybe:
+                    if m.id in event._members_set or m.id in event._maybe_set:
                         await self.remove_user_from_event(m, event)
 
+                # saved right away below so the delayed save isn't needed
+                event.cancel_persist()
                 async with self.config.guild(ctx.guild).events() as cur_events:
                     cur_events[str(event.hoster)] = event.to_json()
                 self.event_cache[ctx.guild.id][event.message] = event
@@ -950,7 +977,7 @@ class EventPoster(commands.Cog):
         if ctx.guild.id not in self.event_cache:
             return
         for message_id, event in self.event_cache[ctx.guild.id].items():
-            if ctx.author.id in event.members:
+            if ctx.author.id in event._members_set:
                 em = await event.make_event_embed(ctx)
                 await event.edit(ctx, embed=em)
 
@@ -1135,6 +1162,7 @@ class EventPoster(commands.Cog):
         """
         async with self.config.guild(ctx.guild).custom_links() as custom_links:
             custom_links[keyword.lower()] = link
+        self.clear_embed_caches(ctx.guild.id)
         await ctx.tick()
 
     @event_settings.command(name="largelinks")
@@ -1150,6 +1178,7 @@ class EventPoster(commands.Cog):
         """
         async with self.config.guild(ctx.guild).large_links() as custom_links:
             custom_links[keyword.lower()] = link
+        self.clear_embed_caches(ctx.guild.id)
         await ctx.tick()
 
     @event_settings.command(name="viewlinks", aliases=["showlinks"])